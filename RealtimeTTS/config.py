@@ -2,8 +2,10 @@
 Configuration module for TTS API
 Manages settings for models, audio, and server configuration
 """
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal, Optional, get_args
+from functools import lru_cache
 import os
 
 
@@ -14,11 +16,12 @@ class TTSConfig(BaseSettings):
     #model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2"
     model_name: str = "tts_models/en/ljspeech/tacotron2-DDC"
     use_cuda: bool = True  # Use GPU if available
+    cpu_threads: int = 1  # torch intra-op threads when running on CPU (0 = torch default)
     
     # Audio Settings
     sample_rate: int = 24000  # XTTSv2 default sample rate
     audio_format: str = "wav"
-    chunk_size: int = 4096  # For streaming
+    chunk_size: int = Field(16384, ge=1024)  # Bytes per streamed chunk (rounded down to whole samples)
     
     # Server Settings
     host: str = "0.0.0.0"
@@ -29,6 +32,7 @@ class TTSConfig(BaseSettings):
     default_language: str = "en"
     #default_speaker_wav: Optional[str] = "new.mp3"  # Default voice for cloning
     default_speaker_wav: Optional[str] = None  # Default voice for cloning
+    voice_embedding_cache_capacity: int = 50  # Speakers whose XTTS latents are kept in memory
     
     # Paths
     model_cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "tts")
@@ -37,14 +41,21 @@ class TTSConfig(BaseSettings):
     # Performance
     enable_text_splitting: bool = True  # Split long texts for better streaming
     max_text_length: int = 500  # Characters per chunk
+    ws_frame_size: int = 16384  # Minimum bytes per WebSocket audio frame
+    compile_model: bool = False  # torch.compile the XTTS GPT decoder (slow startup, faster synthesis)
+    mixed_precision: bool = False  # Run the XTTS GPT decoder under bf16/fp16 autocast on CUDA
     
-    class Config:
-        env_prefix = "TTS_"
-        env_file = ".env"
+    model_config = SettingsConfigDict(env_prefix="TTS_", env_file=".env")
+
+
+@lru_cache(maxsize=1)
+def get_config() -> TTSConfig:
+    """Return the cached config instance (settings are parsed once)"""
+    return TTSConfig()
 
 
 # Global config instance
-config = TTSConfig()
+config = get_config()
 
 
 # Predefined voice configurations
@@ -65,7 +76,9 @@ VOICE_PRESETS = {
 
 
 # Supported languages for XTTSv2
-SUPPORTED_LANGUAGES = [
+# Used as a Literal type so pydantic-core validates membership natively
+LanguageCode = Literal[
     "en", "es", "fr", "de", "it", "pt", "pl", "tr", 
     "ru", "nl", "cs", "ar", "zh-cn", "ja", "hu", "ko", "hi"
 ]
+SUPPORTED_LANGUAGES = list(get_args(LanguageCode))
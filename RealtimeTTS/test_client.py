@@ -3,9 +3,11 @@ Test client for TTS API
 Demonstrates usage of REST, streaming, and WebSocket endpoints
 """
 import requests
+from requests.adapters import HTTPAdapter
 import asyncio
 import websockets
 import json
+import orjson
 import argparse
 from pathlib import Path
 from typing import Optional
@@ -13,6 +15,21 @@ import sounddevice as sd
 import soundfile as sf
 import numpy as np
 import io
+import re
+import shutil
+import struct
+import threading
+
+
+# Fade length applied at the start/end of real-time playback to avoid clicks
+FADE_MS = 2
+
+# Little-endian uint32 used for WAV header fields
+_U32 = struct.Struct('<I')
+
+# Text is sent to /ws/tts in sentence-aligned chunks of at most this many characters
+MAX_CHUNK_CHARS = 500
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
 
 
 class TTSClient:
@@ -21,10 +38,35 @@ class TTSClient:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
+        
+        # Reuse keep-alive connections across calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Shared audio output stream, reopened only when the format changes
+        self._stream = None
+        self._stream_format = None
+        
+        # Thread writing the non-blocking file playback in progress
+        self._playback = None
+    
+    def close(self):
+        """Wait for playback to finish, close the audio stream and release pooled HTTP connections"""
+        self.wait_playback()
+        self._close_stream()
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def health_check(self):
         """Check API health"""
-        response = requests.get(f"{self.base_url}/health")
+        response = self.session.get(f"{self.base_url}/health")
         print("Health Check:")
         print(json.dumps(response.json(), indent=2))
         return response.json()
@@ -46,7 +88,7 @@ class TTSClient:
             "speed": 1.0
         }
         
-        response = requests.post(f"{self.base_url}/api/tts", json=payload)
+        response = self.session.post(f"{self.base_url}/api/tts", json=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -56,14 +98,9 @@ class TTSClient:
             # Download and play audio
             if play:
                 audio_url = f"{self.base_url}{result['audio_url']}"
-                audio_response = requests.get(audio_url)
+                temp_file = "temp_audio.wav"
                 
-                if audio_response.status_code == 200:
-                    # Save to temp file
-                    temp_file = "temp_audio.wav"
-                    with open(temp_file, "wb") as f:
-                        f.write(audio_response.content)
-                    
+                if self._download(audio_url, temp_file):
                     print("Playing audio...")
                     self._play_audio(temp_file)
                     
@@ -89,33 +126,35 @@ class TTSClient:
             "text": text,
             "language": language,
             "speaker_wav": speaker_wav,
-            "chunk_size": 4096
+            "chunk_size": 16384
         }
         
-        response = requests.post(
+        with self.session.post(
             f"{self.base_url}/api/tts/stream",
             json=payload,
             stream=True
-        )
-        
-        if response.status_code == 200:
-            # Save streamed audio
-            with open(save_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=4096):
-                    if chunk:
-                        f.write(chunk)
+        ) as response:
+            if response.status_code != 200:
+                print(f"Error: {response.status_code}")
+                print(response.text)
+                return
             
-            print(f"Audio saved to: {save_path}")
-            print("Playing audio...")
-            self._play_audio(save_path)
-        else:
-            print(f"Error: {response.status_code}")
-            print(response.text)
+            # Save streamed audio (C-level copy loop with a reused buffer)
+            response.raw.decode_content = True
+            with open(save_path, "wb") as f:
+                shutil.copyfileobj(response.raw, f, length=64 * 1024)
+        
+        print(f"Audio saved to: {save_path}")
+        print("Playing audio...")
+        self._play_audio(save_path)
     
     async def tts_websocket(self, text: str, language: str = "en", speaker_wav: Optional[str] = None, realtime_playback: bool = True):
         """
         Real-time TTS using WebSocket
         
+        Long text is split into sentence-aligned chunks that are all sent over
+        one connection, so the server synthesizes chunk N+1 while chunk N plays.
+        
         Args:
             text: Text to convert
             language: Language code
@@ -125,104 +164,168 @@ class TTSClient:
         print(f"\nWebSocket TTS for: '{text[:50]}...'")
         
         uri = f"{self.ws_url}/ws/tts"
+        text_chunks = _split_text(text)
         
-        audio_chunks = []
+        audio_buffer = _AudioBuffer()
         
         try:
             async with websockets.connect(uri) as websocket:
-                # Send request
-                await websocket.send(json.dumps({
-                    "text": text,
-                    "language": language,
-                    "speaker_wav": speaker_wav
-                }))
+                # Send one request per text chunk; the server answers them in order
+                for chunk_text in text_chunks:
+                    await websocket.send(orjson.dumps({
+                        "text": chunk_text,
+                        "language": language,
+                        "speaker_wav": speaker_wav
+                    }).decode())
                 
-                print("Receiving audio chunks...")
+                print(f"Receiving audio chunks ({len(text_chunks)} text chunks)...")
                 if realtime_playback:
                     print("🎵 Playing audio in real-time...")
                 
                 # For real-time playback
                 stream = None
                 sample_rate = 22050  # Default for Tacotron2
-                header_parsed = False
                 
-                while True:
-                    message = await websocket.recv()
+                # Playback runs in a worker thread fed by a bounded queue,
+                # so receiving the next chunk overlaps with stream.write()
+                loop = asyncio.get_running_loop()
+                playback_queue = asyncio.Queue(maxsize=8)
+                playback_thread = None
+                
+                for _ in text_chunks:
+                    # Each response starts with a chunk carrying a WAV header
+                    message = await self._recv_first_audio(websocket, audio_buffer)
+                    if message is None:
+                        continue
                     
-                    # Check if it's a status message (JSON) or audio data (bytes)
-                    if isinstance(message, bytes):
-                        audio_chunks.append(message)
+                    if not audio_buffer.size:
+                        # Keep the first header for the saved file
+                        audio_buffer.write(message)
                         
-                        if realtime_playback:
-                            # Parse WAV header from first chunk to get sample rate
-                            if not header_parsed and len(message) > 44:
-                                import struct
-                                # Sample rate is at bytes 24-27 in WAV header
-                                sample_rate = struct.unpack('<I', message[24:28])[0]
-                                header_parsed = True
-                                
-                                # Start audio stream
-                                stream = sd.OutputStream(
-                                    samplerate=sample_rate,
-                                    channels=1,
-                                    dtype='int16'
-                                )
-                                stream.start()
-                                
-                                # Play first chunk (skip WAV header - 44 bytes)
-                                pcm_data = np.frombuffer(message[44:], dtype=np.int16)
-                                if len(pcm_data) > 0:
-                                    stream.write(pcm_data)
-                                print(".", end="", flush=True)
-                            elif header_parsed:
-                                # Play subsequent chunks (raw PCM)
-                                pcm_data = np.frombuffer(message, dtype=np.int16)
-                                if len(pcm_data) > 0:
-                                    stream.write(pcm_data)
-                                print(".", end="", flush=True)
-                        else:
-                            print(".", end="", flush=True)
+                        if realtime_playback and len(message) > 44:
+                            # Sample rate is at bytes 24-27 in WAV header
+                            sample_rate = _U32.unpack_from(message, 24)[0]
+                            
+                            # Shared audio stream (raw int16 PCM, no numpy decode)
+                            self.wait_playback()
+                            stream = self._get_stream(sample_rate)
+                            
+                            playback_thread = threading.Thread(
+                                target=self._playback_worker,
+                                args=(stream, playback_queue, loop, sample_rate),
+                                daemon=True
+                            )
+                            playback_thread.start()
                     else:
-                        # JSON status message
-                        status = json.loads(message)
-                        print(f"\nStatus: {status}")
+                        audio_buffer.write(memoryview(message)[44:])
+                    
+                    # Play first chunk (skip WAV header - 44 bytes)
+                    if stream:
+                        await playback_queue.put(memoryview(message)[44:])
+                    print(".", end="", flush=True)
+                    
+                    # Remaining messages: raw PCM chunks or JSON status
+                    complete = False
+                    while not complete:
+                        message = await websocket.recv()
                         
-                        if status.get("status") == "complete":
-                            break
+                        if isinstance(message, bytes):
+                            audio_buffer.write(message)
+                            if stream:
+                                await playback_queue.put(message)
+                            print(".", end="", flush=True)
+                        else:
+                            # JSON status message
+                            status = orjson.loads(message)
+                            print(f"\nStatus: {status}")
+                            audio_buffer.reserve(status.get("estimated_bytes", 0))
+                            complete = status.get("status") == "complete"
                 
-                # Stop and close the stream
+                # Drain queued audio (the shared stream stays open for reuse)
                 if stream:
-                    stream.stop()
-                    stream.close()
+                    await playback_queue.put(None)
+                    await loop.run_in_executor(None, playback_thread.join)
                     print("\n✅ Real-time playback complete!")
                 
                 # Save to file for later playback
-                if audio_chunks:
+                if audio_buffer.size:
                     output_file = "websocket_output.wav"
+                    wav_data = audio_buffer.getvalue()
                     
-                    # Concatenate all chunks
-                    full_audio = b''.join(audio_chunks)
-                    
-                    # Fix WAV header size
-                    import struct
-                    
+                    # Fix WAV header size in place (no full-audio copies)
                     # Update file size (bytes 4-7)
-                    file_size = len(full_audio) - 8
-                    full_audio = full_audio[:4] + struct.pack('<I', file_size) + full_audio[8:]
+                    _U32.pack_into(wav_data, 4, len(wav_data) - 8)
                     
                     # Update data chunk size (bytes 40-43)
-                    data_size = len(full_audio) - 44
-                    full_audio = full_audio[:40] + struct.pack('<I', data_size) + full_audio[44:]
+                    _U32.pack_into(wav_data, 40, len(wav_data) - 44)
                     
                     # Write updated audio
                     with open(output_file, "wb") as f:
-                        f.write(full_audio)
+                        f.write(wav_data)
                     
                     print(f"Audio saved to: {output_file}")
         
         except Exception as e:
             print(f"WebSocket error: {e}")
     
+    @staticmethod
+    async def _recv_first_audio(websocket, audio_buffer: "_AudioBuffer") -> Optional[bytes]:
+        """
+        Print status messages until the first audio chunk of a response arrives
+        
+        Args:
+            websocket: Connected WebSocket
+            audio_buffer: Buffer to preallocate from the server's size hint
+            
+        Returns:
+            The first audio chunk, or None if the response completed without audio
+        """
+        while True:
+            message = await websocket.recv()
+            if isinstance(message, bytes):
+                return message
+            
+            status = orjson.loads(message)
+            print(f"\nStatus: {status}")
+            audio_buffer.reserve(status.get("estimated_bytes", 0))
+            if status.get("status") == "complete":
+                return None
+    
+    @staticmethod
+    def _playback_worker(stream, playback_queue: asyncio.Queue, loop, sample_rate: int):
+        """
+        Write queued PCM chunks to the output stream (runs in a worker thread)
+        
+        Args:
+            stream: Started sounddevice raw output stream
+            playback_queue: Queue of raw int16 PCM buffers, terminated by None
+            loop: Event loop that owns the queue
+            sample_rate: Sample rate of the stream
+        """
+        fade_len = sample_rate * FADE_MS // 1000
+        pending = None
+        first_chunk = True
+        
+        while True:
+            chunk = asyncio.run_coroutine_threadsafe(playback_queue.get(), loop).result()
+            
+            # Hold one chunk back so the final one can be faded out
+            if pending is not None:
+                if chunk is None:
+                    pending = _apply_fade(pending, fade_len, fade_in=False)
+                stream.write(pending)
+                pending = None
+            
+            if chunk is None:
+                break
+            
+            if len(chunk) == 0:
+                continue
+            if first_chunk:
+                chunk = _apply_fade(chunk, fade_len, fade_in=True)
+                first_chunk = False
+            pending = chunk
+    
     def voice_clone(self, text: str, speaker_audio: str, language: str = "en"):
         """
         Voice cloning
@@ -244,7 +347,7 @@ class TTSClient:
             "language": language
         }
         
-        response = requests.post(f"{self.base_url}/api/voice-clone", json=payload)
+        response = self.session.post(f"{self.base_url}/api/voice-clone", json=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -252,13 +355,9 @@ class TTSClient:
             
             # Download and play
             audio_url = f"{self.base_url}{result['audio_url']}"
-            audio_response = requests.get(audio_url)
+            temp_file = "cloned_voice.wav"
             
-            if audio_response.status_code == 200:
-                temp_file = "cloned_voice.wav"
-                with open(temp_file, "wb") as f:
-                    f.write(audio_response.content)
-                
+            if self._download(audio_url, temp_file):
                 print("Playing cloned voice audio...")
                 self._play_audio(temp_file)
                 
@@ -267,15 +366,169 @@ class TTSClient:
             print(f"Error: {response.status_code}")
             print(response.text)
     
-    def _play_audio(self, audio_path: str):
-        """Play audio file using sounddevice"""
+    def _download(self, url: str, save_path: str) -> bool:
+        """
+        Stream a file to disk without holding it in memory
+        
+        Args:
+            url: File URL
+            save_path: Where to save the file
+            
+        Returns:
+            True if the download succeeded
+        """
+        with self.session.get(url, stream=True) as response:
+            if response.status_code != 200:
+                return False
+            
+            response.raw.decode_content = True
+            with open(save_path, "wb") as f:
+                shutil.copyfileobj(response.raw, f, length=64 * 1024)
+        return True
+    
+    def _get_stream(self, sample_rate: int, channels: int = 1) -> sd.RawOutputStream:
+        """
+        Return the shared int16 output stream, opening it on first use
+        
+        Opening a PortAudio stream costs tens of ms, so one stream is reused
+        across calls and only reopened when the sample rate or channel count changes.
+        
+        Args:
+            sample_rate: Sample rate of the audio to play
+            channels: Number of channels
+            
+        Returns:
+            Started raw output stream
+        """
+        if self._stream is None or self._stream_format != (sample_rate, channels):
+            self._close_stream()
+            self._stream = sd.RawOutputStream(
+                samplerate=sample_rate,
+                channels=channels,
+                dtype='int16'
+            )
+            self._stream.start()
+            self._stream_format = (sample_rate, channels)
+        return self._stream
+    
+    def _close_stream(self):
+        """Stop (after pending audio has played) and close the shared stream"""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+            self._stream_format = None
+    
+    def _play_audio(self, audio_path: str) -> Optional[sd.RawOutputStream]:
+        """
+        Start playing an audio file without blocking
+        
+        The file is loaded into memory and written to the shared output stream
+        from a background thread, so the caller can issue the next request
+        while it plays. Use wait_playback() to block until playback has finished.
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            The output stream, or None if playback failed
+        """
         try:
-            data, sample_rate = sf.read(audio_path)
-            sd.play(data, sample_rate)
-            sd.wait()
+            # Only one playback at a time
+            self.wait_playback()
+            
+            data, sample_rate = sf.read(audio_path, dtype='int16', always_2d=True)
+            stream = self._get_stream(sample_rate, data.shape[1])
+            
+            self._playback = threading.Thread(target=stream.write, args=(data,), daemon=True)
+            self._playback.start()
+            return stream
         except Exception as e:
             print(f"Could not play audio: {e}")
             print("(Audio file saved but playback failed)")
+            return None
+    
+    def wait_playback(self):
+        """Block until the current file playback (if any) has been written to the stream"""
+        if self._playback is None:
+            return
+        
+        self._playback.join()
+        self._playback = None
+
+
+class _AudioBuffer:
+    """
+    Append-only byte buffer that can be preallocated from a size hint,
+    so received chunks are copied into place instead of regrowing the buffer
+    """
+    
+    def __init__(self):
+        self.data = bytearray()
+        self.size = 0
+    
+    def reserve(self, n: int):
+        """Make room for at least n more bytes"""
+        missing = self.size + n - len(self.data)
+        if missing > 0:
+            self.data.extend(bytes(missing))
+    
+    def write(self, chunk):
+        """Append a bytes-like chunk"""
+        end = self.size + len(chunk)
+        if end <= len(self.data):
+            self.data[self.size:end] = chunk
+        else:
+            # No hint or hint too small: fall back to growing the buffer
+            del self.data[self.size:]
+            self.data.extend(chunk)
+        self.size = end
+    
+    def getvalue(self) -> bytearray:
+        """Trim unused capacity and return the written bytes"""
+        del self.data[self.size:]
+        return self.data
+
+
+def _split_text(text: str, max_length: int = MAX_CHUNK_CHARS) -> list:
+    """
+    Split text at sentence boundaries and greedily pack sentences into chunks
+    
+    Args:
+        text: Input text
+        max_length: Maximum characters per chunk (longer single sentences are kept whole)
+        
+    Returns:
+        List of text chunks
+    """
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_length:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    
+    if current:
+        chunks.append(current)
+    return chunks if chunks else [text]
+
+
+def _apply_fade(pcm_bytes, fade_len: int, fade_in: bool) -> np.ndarray:
+    """Apply a linear fade-in or fade-out over the first/last fade_len samples"""
+    pcm_data = np.frombuffer(pcm_bytes, dtype=np.int16).copy()
+    n = min(fade_len, len(pcm_data))
+    if n == 0:
+        return pcm_data
+    
+    if fade_in:
+        pcm_data[:n] = (pcm_data[:n] * np.linspace(0.0, 1.0, n)).astype(np.int16)
+    else:
+        pcm_data[-n:] = (pcm_data[-n:] * np.linspace(1.0, 0.0, n)).astype(np.int16)
+    return pcm_data
 
 
 def main():
@@ -291,25 +544,24 @@ def main():
     
     args = parser.parse_args()
     
-    client = TTSClient(base_url=args.url)
-    
-    if args.mode == "health":
-        client.health_check()
-    
-    elif args.mode == "rest":
-        client.tts_basic(args.text, args.language)
-    
-    elif args.mode == "stream":
-        client.tts_streaming(args.text, args.language, args.speaker)
-    
-    elif args.mode == "websocket":
-        asyncio.run(client.tts_websocket(args.text, args.language, args.speaker))
-    
-    elif args.mode == "clone":
-        if not args.speaker:
-            print("Error: --speaker required for voice cloning mode")
-            return
-        client.voice_clone(args.text, args.speaker, args.language)
+    with TTSClient(base_url=args.url) as client:
+        if args.mode == "health":
+            client.health_check()
+        
+        elif args.mode == "rest":
+            client.tts_basic(args.text, args.language)
+        
+        elif args.mode == "stream":
+            client.tts_streaming(args.text, args.language, args.speaker)
+        
+        elif args.mode == "websocket":
+            asyncio.run(client.tts_websocket(args.text, args.language, args.speaker))
+        
+        elif args.mode == "clone":
+            if not args.speaker:
+                print("Error: --speaker required for voice cloning mode")
+                return
+            client.voice_clone(args.text, args.speaker, args.language)
 
 
 if __name__ == "__main__":
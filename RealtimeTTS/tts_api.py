@@ -2,26 +2,31 @@
 FastAPI TTS API Server
 Provides REST and WebSocket endpoints for real-time text-to-speech
 """
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 import uvicorn
+import orjson
 import logging
 import asyncio
+import sys
+import time
+import secrets
 from pathlib import Path
-import uuid
-from datetime import datetime
 
 from models import (
     TTSRequest, TTSResponse, TTSStreamRequest, 
     HealthCheckResponse, VoiceCloneRequest, ErrorResponse
 )
 from tts_service import tts_service
-from config import config, SUPPORTED_LANGUAGES
+from config import get_config, SUPPORTED_LANGUAGES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+config = get_config()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Coqui TTS API",
@@ -42,6 +47,28 @@ app.add_middleware(
 OUTPUT_DIR = Path("./generated_audio")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Generated audio is kept for 1 hour, swept every 5 minutes
+AUDIO_RETENTION_SECONDS = 3600
+CLEANUP_INTERVAL_SECONDS = 300
+
+
+class AudioFiles(StaticFiles):
+    """StaticFiles that serves generated audio as WAV downloads, cacheable for its retention period"""
+    
+    def file_response(self, full_path, *args, **kwargs):
+        response = super().file_response(full_path, *args, **kwargs)
+        # Same headers as FileResponse(media_type="audio/wav", filename=...),
+        # rather than the platform's mimetypes guess (e.g. audio/x-wav)
+        response.headers["Content-Type"] = "audio/wav"
+        response.headers["Content-Disposition"] = f'attachment; filename="{Path(full_path).name}"'
+        # Filenames are unique per request, so the content never changes
+        response.headers["Cache-Control"] = f"public, max-age={AUDIO_RETENTION_SECONDS}"
+        return response
+
+
+# Serve generated audio files directly (stat is done once by StaticFiles, 404 handled natively)
+app.mount("/audio", AudioFiles(directory=str(OUTPUT_DIR)), name="audio")
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -53,6 +80,9 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize TTS service: {e}")
         raise
+    
+    # Keep a reference so the sweeper task is not garbage collected
+    app.state.cleanup_task = asyncio.create_task(cleanup_expired_files())
 
 
 @app.get("/", tags=["General"])
@@ -85,7 +115,7 @@ async def health_check():
 
 
 @app.post("/api/tts", response_model=TTSResponse, tags=["TTS"])
-async def text_to_speech(request: TTSRequest, background_tasks: BackgroundTasks):
+async def text_to_speech(request: TTSRequest):
     """
     Convert text to speech (REST endpoint)
     Returns audio file URL
@@ -94,31 +124,21 @@ async def text_to_speech(request: TTSRequest, background_tasks: BackgroundTasks)
         logger.info(f"Received TTS request: {len(request.text)} characters, language: {request.language}")
         
         # Generate unique filename
-        file_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"tts_{timestamp}_{file_id}.wav"
+        output_filename = f"tts_{time.time_ns()}_{secrets.token_hex(4)}.wav"
         output_path = OUTPUT_DIR / output_filename
         
-        # Synthesize speech
-        audio, sample_rate, metrics = tts_service.synthesize(
+        # Synthesize speech, writing each sentence to disk as it is produced
+        duration, sample_rate, metrics = tts_service.synthesize_to_file(
             text=request.text,
+            output_path=str(output_path),
             language=request.language,
             speaker_wav=request.speaker_wav,
             speed=request.speed
         )
         
-        # Save audio file
-        tts_service.save_audio(audio, sample_rate, str(output_path))
-        
-        # Calculate duration
-        duration = len(audio) / sample_rate
-        
         # Log metrics
         logger.info(f"Synthesis metrics: {metrics}")
         
-        # Schedule cleanup after 1 hour
-        background_tasks.add_task(cleanup_file, output_path, delay=3600)
-        
         return TTSResponse(
             success=True,
             message="Text-to-speech conversion successful",
@@ -150,7 +170,8 @@ async def text_to_speech_stream(request: TTSStreamRequest):
                 speaker_wav=request.speaker_wav,
                 chunk_size=request.chunk_size
             ):
-                yield chunk
+                # StreamingResponse only passes bytes through unencoded
+                yield bytes(chunk)
         
         return StreamingResponse(
             generate(),
@@ -176,44 +197,58 @@ async def websocket_tts(websocket: WebSocket):
     - Server streams: audio chunks as binary data
     - Server sends: {"status": "complete"} when done
     """
-    # Accept with longer ping timeout for long audio generation
+    # Ping interval/timeout are configured on the Uvicorn server (see __main__)
     await websocket.accept()
     logger.info("WebSocket connection established")
     
-    # Configure ping/pong parameters to prevent timeout during long synthesis
-    # This prevents "keepalive ping failed" errors during real-time playback
-    websocket.client_state.ping_timeout = 60  # Increase from default 20s to 60s
-    
     try:
         while True:
             # Receive text from client
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
             
             text = data.get("text", "")
             language = data.get("language", "en")
             speaker_wav = data.get("speaker_wav", None)
             
             if not text:
-                await websocket.send_json({"error": "No text provided"})
+                await send_ws_json(websocket, {"error": "No text provided"})
                 continue
             
             logger.info(f"WebSocket TTS: {len(text)} characters, language: {language}")
             
-            # Send status
-            await websocket.send_json({"status": "processing"})
+            # Send status (with a size hint so clients can preallocate)
+            await send_ws_json(websocket, {
+                "status": "processing",
+                "estimated_bytes": tts_service.estimate_audio_bytes(text)
+            })
             
-            # Stream audio chunks
+            # Stream audio chunks, coalesced into larger frames to cut
+            # per-frame framing and send overhead. The first chunk (WAV
+            # header) goes out immediately so the client can start playback.
             chunk_count = 0
+            frame = bytearray()
             for chunk in tts_service.synthesize_streaming(
                 text=text,
                 language=language,
                 speaker_wav=speaker_wav
             ):
-                await websocket.send_bytes(chunk)
+                if chunk_count == 0:
+                    await websocket.send_bytes(chunk)
+                    chunk_count += 1
+                    continue
+                
+                frame.extend(chunk)
+                if len(frame) >= config.ws_frame_size:
+                    await websocket.send_bytes(bytes(frame))
+                    frame.clear()
+                    chunk_count += 1
+            
+            if frame:
+                await websocket.send_bytes(bytes(frame))
                 chunk_count += 1
             
             # Send completion status
-            await websocket.send_json({
+            await send_ws_json(websocket, {
                 "status": "complete",
                 "chunks_sent": chunk_count
             })
@@ -224,13 +259,13 @@ async def websocket_tts(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         try:
-            await websocket.send_json({"error": str(e)})
+            await send_ws_json(websocket, {"error": str(e)})
         except:
             pass
 
 
 @app.post("/api/voice-clone", response_model=TTSResponse, tags=["Voice Cloning"])
-async def voice_clone(request: VoiceCloneRequest, background_tasks: BackgroundTasks):
+async def voice_clone(request: VoiceCloneRequest):
     """
     Generate speech with voice cloning
     Requires reference audio file (6+ seconds)
@@ -246,9 +281,7 @@ async def voice_clone(request: VoiceCloneRequest, background_tasks: BackgroundTa
         logger.info(f"Voice cloning request with speaker: {request.speaker_audio_path}")
         
         # Generate output filename
-        file_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"cloned_{timestamp}_{file_id}.wav"
+        output_filename = f"cloned_{time.time_ns()}_{secrets.token_hex(4)}.wav"
         output_path = OUTPUT_DIR / output_filename
         
         # Synthesize with voice cloning
@@ -263,9 +296,6 @@ async def voice_clone(request: VoiceCloneRequest, background_tasks: BackgroundTa
         
         duration = len(audio) / sample_rate
         
-        # Schedule cleanup
-        background_tasks.add_task(cleanup_file, output_path, delay=3600)
-        
         return TTSResponse(
             success=True,
             message="Voice cloning successful",
@@ -281,48 +311,52 @@ async def voice_clone(request: VoiceCloneRequest, background_tasks: BackgroundTa
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/audio/{filename}", tags=["Audio"])
-async def get_audio(filename: str):
-    """
-    Serve generated audio files
+async def send_ws_json(websocket: WebSocket, payload: dict):
     """
-    file_path = OUTPUT_DIR / filename
+    Send a JSON control message as a text frame using orjson
     
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Audio file not found")
-    
-    return FileResponse(
-        file_path,
-        media_type="audio/wav",
-        filename=filename
-    )
+    Args:
+        websocket: Connected WebSocket
+        payload: JSON-serializable message
+    """
+    await websocket.send_text(orjson.dumps(payload).decode())
 
 
-async def cleanup_file(file_path: Path, delay: int = 0):
+async def cleanup_expired_files():
     """
-    Clean up generated audio file after delay
+    Periodically delete generated audio files older than AUDIO_RETENTION_SECONDS
     
-    Args:
-        file_path: Path to file
-        delay: Delay in seconds before deletion
+    Runs as a single background task for the lifetime of the app.
     """
-    if delay > 0:
-        await asyncio.sleep(delay)
-    
-    try:
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"Cleaned up file: {file_path}")
-    except Exception as e:
-        logger.error(f"Failed to cleanup file {file_path}: {e}")
+    while True:
+        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+        
+        cutoff = time.time() - AUDIO_RETENTION_SECONDS
+        for file_path in OUTPUT_DIR.iterdir():
+            try:
+                if file_path.stat().st_mtime < cutoff:
+                    file_path.unlink(missing_ok=True)
+                    logger.info(f"Cleaned up file: {file_path}")
+            except Exception as e:
+                logger.error(f"Failed to cleanup file {file_path}: {e}")
 
 
 if __name__ == "__main__":
     # Run the server
+    # uvloop/httptools replace the pure-Python event loop and HTTP parser;
+    # uvloop is not available on Windows, so fall back to asyncio there
     uvicorn.run(
         "tts_api:app",
         host=config.host,
         port=config.port,
         workers=config.workers,
-        reload=False
+        reload=False,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
+        backlog=2048,
+        timeout_keep_alive=75,
+        # Longer ping timeout prevents "keepalive ping failed" during long synthesis
+        ws_ping_interval=20,
+        ws_ping_timeout=60
     )
@@ -2,13 +2,19 @@
 Core TTS Service using Coqui TTS XTTSv2
 Handles model initialization, synthesis, and streaming
 """
+import os
 import torch
 import numpy as np
 from TTS.api import TTS
-from typing import Generator, Optional, Tuple
+from typing import Generator, Optional, Tuple, Union
 import logging
-import io
-import soundfile as sf
+import re
+import struct
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import wave
 from pathlib import Path
 from config import config
 import time
@@ -16,6 +22,59 @@ import time
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Conservative speaking rate used to estimate output size from text length
+SPEECH_CHARS_PER_SECOND = 12
+
+# Bytes of a speaker file hashed to build its cache key
+SPEAKER_HASH_BYTES = 65536
+
+# Sentence endings (. ! ?) and, for long sentences, clause breaks (, ;)
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_CLAUSE_RE = re.compile(r'(?<=[,;])\s+')
+
+
+def _wav_header(n_samples: Optional[int], sample_rate: int, channels: int = 1, bits: int = 16) -> bytes:
+    """
+    Build a 44-byte RIFF/WAVE header for PCM audio
+    
+    Args:
+        n_samples: Number of samples (per channel), or None when the length is
+            not known yet (streaming), which writes the maximum sizes
+        sample_rate: Sample rate
+        channels: Number of channels
+        bits: Bits per sample
+        
+    Returns:
+        WAV header bytes
+    """
+    block_align = channels * bits // 8
+    if n_samples is None:
+        data_size = riff_size = 0xFFFFFFFF
+    else:
+        data_size = n_samples * block_align
+        riff_size = 36 + data_size
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b'data', data_size
+    )
+
+
+def _to_pcm16(audio) -> np.ndarray:
+    """Convert float audio in [-1, 1] (numpy array or torch tensor) to 16-bit PCM samples"""
+    if torch.is_tensor(audio):
+        # Convert on the tensor's device so only int16 (half the bytes of
+        # float32) is copied back to the host
+        pcm = (audio.detach().float().clamp(-1.0, 1.0) * 32767.0).to(torch.int16)
+        return pcm.cpu().numpy()
+    
+    # Scale into a single float32 buffer and clip it in place, so only one
+    # temporary is allocated regardless of the input dtype
+    scaled = np.multiply(audio, 32767.0, dtype=np.float32)
+    np.clip(scaled, -32768.0, 32767.0, out=scaled)
+    return scaled.astype(np.int16)
+
 
 class TTSService:
     """
@@ -27,8 +86,19 @@ class TTSService:
         self.model = None
         self.device = None
         self.model_loaded = False
-        self.default_speaker_embedding = None  # Cache for default speaker
+        self.tts_model = None  # Underlying Coqui model (e.g. Xtts)
+        self._is_multi_lingual = False  # Model takes a language argument
+        self.supports_latents = False  # True for models with speaker conditioning latents (XTTS)
+        self.inference_settings = {}  # XTTS sampling settings from the model config
+        self.default_speaker_latents = None  # Cached latents for default speaker
         self.speaker_cache = {}  # Cache for multiple speakers
+        self._validated_paths = set()  # Configured speaker files checked at startup
+        self.latent_cache = OrderedDict()  # LRU of latents for user-supplied speakers
+        self.use_autocast = False  # Mixed precision for the XTTS GPT decoder
+        self.precision = torch.float32
+        # Coqui models keep decoder state on the module (e.g. Tacotron2
+        # attention), so only one call may run at a time
+        self._model_lock = threading.Lock()
         
     def initialize(self):
         """Initialize the TTS model"""
@@ -39,14 +109,61 @@ class TTSService:
             self.device = "cuda" if config.use_cuda and torch.cuda.is_available() else "cpu"
             logger.info(f"Using device: {self.device}")
             
+            # Allow TF32 tensor cores for fp32 matmuls. This changes fp32
+            # numerics, so it is only enabled along with compile_model.
+            if self.device == "cuda" and config.compile_model:
+                torch.set_float32_matmul_precision("high")
+                torch.backends.cuda.matmul.allow_tf32 = True
+            
+            # Avoid intra-op thread oversubscription on CPU. OMP/MKL read their
+            # env vars when first loaded, so set TTS_CPU_THREADS/OMP_NUM_THREADS
+            # at process start for full effect; set_num_threads fixes the live pool.
+            if self.device == "cpu" and config.cpu_threads > 0:
+                os.environ.setdefault("OMP_NUM_THREADS", str(config.cpu_threads))
+                os.environ.setdefault("MKL_NUM_THREADS", str(config.cpu_threads))
+                torch.set_num_threads(config.cpu_threads)
+                logger.info(f"Using {config.cpu_threads} CPU thread(s)")
+            
             # Initialize TTS model
             self.model = TTS(config.model_name).to(self.device)
+            self.tts_model = self.model.synthesizer.tts_model
+            self.supports_latents = hasattr(self.tts_model, "get_conditioning_latents")
+            
+            # Xtts.inference/inference_stream default to their own sampling
+            # values; pass the model config's like TTS.tts (Xtts.synthesize) does
+            if self.supports_latents:
+                model_config = self.tts_model.config
+                self.inference_settings = {
+                    "temperature": model_config.temperature,
+                    "length_penalty": model_config.length_penalty,
+                    "repetition_penalty": model_config.repetition_penalty,
+                    "top_k": model_config.top_k,
+                    "top_p": model_config.top_p,
+                }
+            
+            # Check model capabilities based on model name
+            model_name = config.model_name.lower()
+            self._is_multi_lingual = "xtts" in model_name or "multilingual" in model_name
+            if self._is_multi_lingual:
+                logger.info("Multi-lingual model detected")
             
             # Pre-load default speaker audio into memory
             if config.default_speaker_wav:
                 self._cache_default_speaker()
             
+            if config.mixed_precision and self.device == "cuda" and self.supports_latents:
+                self._enable_mixed_precision()
+            
+            if config.compile_model:
+                self._compile_gpt()
+            
             self.model_loaded = True
+            
+            # Pay the compile cost at startup rather than on the first request
+            if config.compile_model and self.default_speaker_latents:
+                logger.info("Warming up compiled model...")
+                self.synthesize("warmup.", language=config.default_language)
+            
             logger.info("TTS model initialized successfully")
             
         except Exception as e:
@@ -62,6 +179,13 @@ class TTSService:
                 
                 # Store the path in cache for quick access
                 self.speaker_cache['default'] = str(speaker_path.absolute())
+                self._validated_paths.add(self.speaker_cache['default'])
+                
+                # Encode the reference audio once instead of on every request
+                if self.supports_latents:
+                    self.default_speaker_latents = self._compute_speaker_latents(
+                        self.speaker_cache['default']
+                    )
                 
                 logger.info("Default speaker cached successfully")
             else:
@@ -69,6 +193,197 @@ class TTSService:
         except Exception as e:
             logger.error(f"Failed to cache default speaker: {e}")
     
+    def _enable_mixed_precision(self):
+        """Run the XTTS GPT decoder under autocast while keeping the vocoder in fp32"""
+        self.precision = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        self.use_autocast = True
+        
+        # HiFi-GAN output quality suffers in half precision, so it runs with
+        # autocast disabled and fp32 inputs
+        decoder = getattr(self.tts_model, "hifigan_decoder", None)
+        if decoder is not None:
+            decoder_forward = decoder.forward
+            
+            def fp32_forward(latents, g=None):
+                with torch.autocast(device_type="cuda", enabled=False):
+                    return decoder_forward(latents.float(), g=g.float() if g is not None else None)
+            
+            decoder.forward = fp32_forward
+        
+        logger.info(f"Mixed precision enabled for XTTS GPT decoder ({self.precision})")
+    
+    def _compile_gpt(self):
+        """Compile the XTTS GPT decoder forward pass with torch.compile"""
+        gpt = getattr(self.tts_model, "gpt", None)
+        gpt_inference = getattr(gpt, "gpt_inference", None)
+        if gpt_inference is None:
+            logger.warning("Model has no XTTS GPT decoder, skipping torch.compile")
+            return
+        
+        # generate() calls self.forward once per token, so compiling forward
+        # removes the per-step Python dispatch overhead. CUDA graphs
+        # ("reduce-overhead") are not used: HF's KV cache grows every step, so
+        # each decode length would record and keep its own graph.
+        gpt_inference.forward = torch.compile(gpt_inference.forward, mode="default", dynamic=True)
+        logger.info("Compiled XTTS GPT decoder")
+    
+    def _compute_speaker_latents(self, speaker_wav: str) -> dict:
+        """
+        Run the XTTS speaker encoder on reference audio
+        
+        Args:
+            speaker_wav: Path to speaker audio
+            
+        Returns:
+            Dict with 'gpt_cond' and 'spk_emb' tensors on the model device,
+            and 'encode_ms' (time the encoder took)
+        """
+        encode_start = time.time()
+        with self._model_lock, torch.inference_mode():
+            gpt_cond, spk_emb = self.tts_model.get_conditioning_latents(
+                audio_path=speaker_wav,
+                gpt_cond_len=6,
+                max_ref_length=10
+            )
+        return {
+            "gpt_cond": gpt_cond.to(self.device),
+            "spk_emb": spk_emb.to(self.device),
+            "encode_ms": round((time.time() - encode_start) * 1000, 2)
+        }
+    
+    def _get_speaker_latents(self, speaker_wav: Optional[str]) -> Optional[dict]:
+        """
+        Get XTTS conditioning latents for a speaker, computing them on first use
+        
+        Args:
+            speaker_wav: Path to speaker audio
+            
+        Returns:
+            Latents dict, or None if the model does not use latents or the file is missing
+        """
+        if not self.supports_latents or not speaker_wav:
+            return None
+        
+        if speaker_wav == self.speaker_cache.get('default') and self.default_speaker_latents:
+            return self.default_speaker_latents
+        
+        # Key on a hash of the file head plus its size (avoids hashing long WAVs).
+        # Opening directly doubles as the existence check.
+        try:
+            with open(speaker_wav, "rb") as f:
+                head = f.read(SPEAKER_HASH_BYTES)
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return None
+        key = f"{hashlib.blake2b(head, digest_size=16).hexdigest()}:{size}"
+        
+        latents = self.latent_cache.get(key)
+        if latents is not None:
+            self.latent_cache.move_to_end(key)
+            logger.info(f"Speaker latent cache hit: {speaker_wav} (saved {latents['encode_ms']}ms)")
+            return latents
+        
+        latents = self._compute_speaker_latents(speaker_wav)
+        logger.info(f"Speaker latent cache miss: {speaker_wav} (encoded in {latents['encode_ms']}ms)")
+        
+        self.latent_cache[key] = latents
+        if len(self.latent_cache) > config.voice_embedding_cache_capacity:
+            self.latent_cache.popitem(last=False)
+        return latents
+    
+    def _speaker_exists(self, speaker_wav: str) -> bool:
+        """Check a speaker file exists, skipping the check for the cached default speaker"""
+        # Request-supplied paths are checked every time, since the file may be
+        # removed after first use
+        if speaker_wav in self._validated_paths:
+            return True
+        return os.path.isfile(speaker_wav)
+    
+    def _resolve_speaker_wav(self, speaker_wav: Optional[str]) -> Optional[str]:
+        """Use provided speaker_wav, or fall back to cached default"""
+        if not speaker_wav:
+            if 'default' in self.speaker_cache:
+                speaker_wav = self.speaker_cache['default']
+                logger.info(f"Using cached default speaker")
+            elif config.default_speaker_wav:
+                speaker_wav = config.default_speaker_wav
+                logger.info(f"Using default speaker: {speaker_wav}")
+        return speaker_wav
+    
+    def _prepare_params(self, speaker_wav: Optional[str]) -> dict:
+        """
+        Resolve the parts of a synthesis call that do not depend on the text
+        
+        Args:
+            speaker_wav: Path to speaker audio (None for the default speaker)
+            
+        Returns:
+            Dict with 'latents' (XTTS conditioning latents or None) and
+            'speaker_wav' (existing speaker file for TTS.tts, or None)
+        """
+        speaker_wav = self._resolve_speaker_wav(speaker_wav)
+        
+        # XTTS with a speaker: use cached conditioning latents and call the
+        # model directly, skipping the speaker encoder
+        latents = self._get_speaker_latents(speaker_wav)
+        
+        # Otherwise add speaker_wav if available (for voice cloning models)
+        if latents is not None or not (speaker_wav and self._speaker_exists(speaker_wav)):
+            speaker_wav = None
+        elif speaker_wav:
+            logger.info(f"Using speaker audio: {speaker_wav}")
+        
+        return {"latents": latents, "speaker_wav": speaker_wav}
+    
+    def _run_tts(self, base_params: dict, text: str, language: str, speed: float = 1.0) -> np.ndarray:
+        """
+        Run the model on one piece of text
+        
+        Args:
+            base_params: Result of _prepare_params()
+            text: Text to convert to speech
+            language: Language code
+            speed: Speech speed multiplier
+            
+        Returns:
+            Audio as numpy array
+        """
+        latents = base_params["latents"]
+        if latents is not None:
+            with self._model_lock, torch.inference_mode(), \
+                    torch.autocast(device_type="cuda", dtype=self.precision, enabled=self.use_autocast):
+                return self.tts_model.inference(
+                    text=text,
+                    language=language,
+                    gpt_cond_latent=latents["gpt_cond"],
+                    speaker_embedding=latents["spk_emb"],
+                    speed=speed,
+                    # Keep long inputs (e.g. voice-clone requests) under XTTS's
+                    # per-call token limit; already-split sentences pass through
+                    enable_text_splitting=True,
+                    **self.inference_settings
+                )["wav"]
+        
+        # Build TTS parameters based on model capabilities
+        tts_params = {"text": text, "speed": speed}
+        
+        # Add language only for multi-lingual models
+        if self._is_multi_lingual:
+            tts_params["language"] = language
+        
+        if base_params["speaker_wav"]:
+            tts_params["speaker_wav"] = base_params["speaker_wav"]
+        
+        logger.debug(f"TTS call parameters: {list(tts_params.keys())}")
+        with self._model_lock, torch.inference_mode():
+            wav = self.model.tts(**tts_params)
+        
+        # TTS.tts returns a list of Python floats; fromiter with a known count
+        # fills a preallocated float32 array without a boxed intermediate
+        if isinstance(wav, list):
+            wav = np.fromiter(wav, dtype=np.float32, count=len(wav))
+        return wav
+    
     def synthesize(
         self, 
         text: str, 
@@ -97,41 +412,12 @@ class TTSService:
         try:
             logger.info(f"Synthesizing text (length: {len(text)}, language: {language})")
             
-            # Use provided speaker_wav, or fall back to cached default
-            if not speaker_wav:
-                if 'default' in self.speaker_cache:
-                    speaker_wav = self.speaker_cache['default']
-                    logger.info(f"Using cached default speaker")
-                elif config.default_speaker_wav:
-                    speaker_wav = config.default_speaker_wav
-                    logger.info(f"Using default speaker: {speaker_wav}")
-            
-            # Check model capabilities based on model name
-            model_name = config.model_name.lower()
-            is_multi_lingual = "xtts" in model_name or "multilingual" in model_name
-            
-            # Build TTS parameters based on model capabilities
-            tts_params = {"text": text, "speed": speed}
-            
-            # Add language only for multi-lingual models
-            if is_multi_lingual:
-                tts_params["language"] = language
-                logger.info(f"Multi-lingual model detected, adding language: {language}")
-            
-            # Add speaker_wav if available (for voice cloning models)
-            if speaker_wav and Path(speaker_wav).exists():
-                tts_params["speaker_wav"] = speaker_wav
-                logger.info(f"Using speaker audio: {speaker_wav}")
+            base_params = self._prepare_params(speaker_wav)
             
             synthesis_start = time.time()
-            logger.info(f"TTS call parameters: {list(tts_params.keys())}")
-            wav = self.model.tts(**tts_params)
+            wav = self._run_tts(base_params, text, language, speed)
             synthesis_time = time.time() - synthesis_start
             
-            # Convert to numpy array if needed
-            if isinstance(wav, list):
-                wav = np.array(wav)
-            
             total_time = time.time() - start_time
             audio_duration = len(wav) / config.sample_rate
             real_time_factor = audio_duration / synthesis_time if synthesis_time > 0 else 0
@@ -154,13 +440,73 @@ class TTSService:
             logger.error(f"Synthesis failed: {e}")
             raise
     
+    def synthesize_to_file(
+        self,
+        text: str,
+        output_path: str,
+        language: str = "en",
+        speaker_wav: Optional[str] = None,
+        speed: float = 1.0
+    ) -> Tuple[float, int, dict]:
+        """
+        Synthesize speech sentence by sentence, appending 16-bit PCM to a WAV file
+        so the full utterance is never held in memory
+        
+        Args:
+            text: Text to convert to speech
+            output_path: Output WAV file path
+            language: Language code
+            speaker_wav: Path to speaker audio for voice cloning
+            speed: Speech speed multiplier
+            
+        Returns:
+            Tuple of (duration_seconds, sample_rate, metrics)
+        """
+        if not self.model_loaded:
+            raise RuntimeError("TTS model not initialized. Call initialize() first.")
+        
+        start_time = time.time()
+        synthesis_time = 0.0
+        n_samples = 0
+        base_params = self._prepare_params(speaker_wav)
+        
+        # wave patches the RIFF/data sizes in the header on close
+        with wave.open(output_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(config.sample_rate)
+            
+            for sentence in self._split_text(text):
+                logger.debug(f"Synthesizing sentence (length: {len(sentence)})")
+                synthesis_start = time.time()
+                wav = self._run_tts(base_params, sentence, language, speed)
+                synthesis_time += time.time() - synthesis_start
+                
+                wf.writeframesraw(_to_pcm16(wav).tobytes())
+                n_samples += len(wav)
+        
+        total_time = time.time() - start_time
+        audio_duration = n_samples / config.sample_rate
+        real_time_factor = audio_duration / synthesis_time if synthesis_time > 0 else 0
+        
+        metrics = {
+            "synthesis_time_ms": round(synthesis_time * 1000, 2),
+            "total_time_ms": round(total_time * 1000, 2),
+            "audio_duration_s": round(audio_duration, 2),
+            "real_time_factor": round(real_time_factor, 2),
+            "text_length": len(text)
+        }
+        
+        logger.info(f"Audio saved to: {output_path}")
+        return audio_duration, config.sample_rate, metrics
+    
     def synthesize_streaming(
         self,
         text: str,
         language: str = "en",
         speaker_wav: Optional[str] = None,
-        chunk_size: int = 4096
-    ) -> Generator[bytes, None, None]:
+        chunk_size: Optional[int] = None
+    ) -> Generator[Union[bytes, memoryview], None, None]:
         """
         Synthesize speech with streaming output
         
@@ -168,54 +514,126 @@ class TTSService:
             text: Text to convert to speech
             language: Language code
             speaker_wav: Path to speaker audio
-            chunk_size: Size of audio chunks to yield
+            chunk_size: Size of audio chunks to yield (default: config.chunk_size)
             
         Yields:
-            Audio chunks as bytes (first chunk includes WAV header, rest is raw PCM)
+            Audio chunks (first chunk is bytes including the WAV header, the rest
+            are memoryview slices of raw PCM, valid until the next chunk is requested)
         """
         if not self.model_loaded:
             raise RuntimeError("TTS model not initialized")
         
+        # Round down to whole 16-bit mono samples so no chunk splits a sample;
+        # the 44-byte header keeps the first chunk aligned as well
+        chunk_size = chunk_size or config.chunk_size
+        chunk_size -= chunk_size % 2
+        
         try:
             logger.info(f"Starting streaming synthesis for text length: {len(text)}")
             
-            # Split text into sentences for progressive synthesis
-            sentences = self._split_text(text)
+            # XTTS with a speaker streams audio every few GPT tokens; other
+            # models are synthesized sentence by sentence
+            base_params = self._prepare_params(speaker_wav)
+            if base_params["latents"] is not None:
+                pcm_chunks = self._stream_xtts(text, language, base_params["latents"])
+            else:
+                pcm_chunks = self._stream_sentences(text, language, base_params)
             
             # Track if we've sent the header
             header_sent = False
             
-            for i, sentence in enumerate(sentences):
-                if not sentence.strip():
-                    continue
-                
-                logger.info(f"Synthesizing chunk {i+1}/{len(sentences)}")
-                
-                # Synthesize sentence
-                wav, sample_rate, _ = self.synthesize(
-                    text=sentence,
-                    language=language,
-                    speaker_wav=speaker_wav
-                )
+            for pcm in pcm_chunks:
+                # Slice the samples through a byte view instead of copying
+                # them with tobytes() and again for every chunk
+                audio_view = memoryview(pcm).cast("B")
+                chunk_start = 0
                 
                 # For first chunk: send with WAV header
                 # For subsequent chunks: send raw PCM data only
                 if not header_sent:
-                    audio_bytes = self._audio_to_bytes(wav, sample_rate)
+                    # Total length is unknown until synthesis ends, so use the
+                    # unknown-size convention instead of the first block's size
+                    header = _wav_header(None, config.sample_rate)
+                    chunk_start = chunk_size - len(header)
+                    yield header + audio_view[:chunk_start]
                     header_sent = True
-                else:
-                    # Convert to raw PCM bytes (16-bit)
-                    audio_bytes = (wav * 32767).astype(np.int16).tobytes()
                 
                 # Yield chunks
-                for chunk_start in range(0, len(audio_bytes), chunk_size):
-                    chunk = audio_bytes[chunk_start:chunk_start + chunk_size]
-                    yield chunk
+                for chunk_start in range(chunk_start, len(audio_view), chunk_size):
+                    yield audio_view[chunk_start:chunk_start + chunk_size]
                     
         except Exception as e:
             logger.error(f"Streaming synthesis failed: {e}")
             raise
     
+    def _stream_xtts(self, text: str, language: str, latents: dict) -> Generator[np.ndarray, None, None]:
+        """
+        Stream XTTS audio as it is decoded, using cached speaker latents
+        
+        Args:
+            text: Text to convert to speech (split into sentences by the model)
+            language: Language code
+            latents: Speaker conditioning latents
+            
+        Yields:
+            16-bit PCM chunks
+        """
+        wav_chunks = self.tts_model.inference_stream(
+            text=text,
+            language=language,
+            gpt_cond_latent=latents["gpt_cond"],
+            speaker_embedding=latents["spk_emb"],
+            stream_chunk_size=20,
+            overlap_wav_len=1024,
+            enable_text_splitting=True,
+            **self.inference_settings
+        )
+        
+        # Only the model step runs under inference/autocast mode, so those
+        # thread-local modes do not leak into the consumer between yields
+        while True:
+            with self._model_lock, torch.inference_mode(), \
+                    torch.autocast(device_type="cuda", dtype=self.precision, enabled=self.use_autocast):
+                wav_chunk = next(wav_chunks, None)
+            if wav_chunk is None:
+                break
+            yield _to_pcm16(wav_chunk)
+    
+    def _stream_sentences(self, text: str, language: str, base_params: dict) -> Generator[np.ndarray, None, None]:
+        """
+        Synthesize text sentence by sentence
+        
+        Args:
+            text: Text to convert to speech
+            language: Language code
+            base_params: Result of _prepare_params()
+            
+        Yields:
+            16-bit PCM audio per sentence
+        """
+        # Split text into sentences for progressive synthesis
+        sentences = [s for s in self._split_text(text) if s.strip()]
+        
+        def synthesize_sentence(i: int):
+            logger.debug(f"Synthesizing chunk {i+1}/{len(sentences)}")
+            return self._run_tts(base_params, sentences[i], language)
+        
+        # Synthesize the next sentence in a worker thread while the current
+        # one is being yielded, so synthesis overlaps with sending/playback
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            next_result = executor.submit(synthesize_sentence, 0) if sentences else None
+            
+            for i in range(len(sentences)):
+                wav = next_result.result()
+                if i + 1 < len(sentences):
+                    next_result = executor.submit(synthesize_sentence, i + 1)
+                yield _to_pcm16(wav)
+        finally:
+            # If the consumer stops early, drop the pending sentence instead of
+            # blocking (e.g. the event loop) until it finishes
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def _split_text(self, text: str, max_length: int = None) -> list:
         """
         Split text into manageable chunks for streaming
@@ -231,9 +649,7 @@ class TTSService:
             max_length = config.max_text_length
         
         # Split by sentences for progressive streaming
-        import re
-        # Split on sentence endings (. ! ?)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENTENCE_RE.split(text)
         
         chunks = []
         for sentence in sentences:
@@ -244,7 +660,7 @@ class TTSService:
             # If sentence is too long, split it further
             if len(sentence) > max_length:
                 # Split on commas or semicolons
-                sub_chunks = re.split(r'(?<=[,;])\s+', sentence)
+                sub_chunks = _CLAUSE_RE.split(sentence)
                 for sub in sub_chunks:
                     sub = sub.strip()
                     if sub:
@@ -254,22 +670,6 @@ class TTSService:
         
         return chunks if chunks else [text]
     
-    def _audio_to_bytes(self, audio: np.ndarray, sample_rate: int) -> bytes:
-        """
-        Convert numpy audio array to bytes
-        
-        Args:
-            audio: Audio as numpy array
-            sample_rate: Sample rate
-            
-        Returns:
-            Audio as bytes (WAV format)
-        """
-        buffer = io.BytesIO()
-        sf.write(buffer, audio, sample_rate, format='WAV')
-        buffer.seek(0)
-        return buffer.read()
-    
     def save_audio(self, audio: np.ndarray, sample_rate: int, output_path: str):
         """
         Save audio to file
@@ -279,9 +679,26 @@ class TTSService:
             sample_rate: Sample rate
             output_path: Output file path
         """
-        sf.write(output_path, audio, sample_rate)
+        # Fixed 16-bit mono output: write the header and the samples directly
+        # instead of going through libsndfile's format handling
+        pcm = _to_pcm16(audio)
+        with open(output_path, "wb") as f:
+            f.write(_wav_header(pcm.size, sample_rate))
+            f.write(pcm)
         logger.info(f"Audio saved to: {output_path}")
     
+    def estimate_audio_bytes(self, text: str) -> int:
+        """
+        Estimate the size of the 16-bit mono WAV stream produced for text
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Estimated size in bytes (WAV header included)
+        """
+        return 44 + 2 * int(len(text) / SPEECH_CHARS_PER_SECOND * config.sample_rate)
+    
     def is_ready(self) -> bool:
         """Check if service is ready"""
         return self.model_loaded